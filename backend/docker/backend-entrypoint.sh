@@ -14,4 +14,6 @@ echo "=> Starting gunicorn..."
 exec gunicorn echo_project.wsgi:application \
   --bind 0.0.0.0:8000 \
   --workers 3 \
+  --worker-class gthread \
+  --threads 4 \
   --log-level info
@@ -74,6 +74,29 @@ else:
         }
     }
 
+# Persistent database connections (reused across requests, checked before reuse)
+DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Cache configuration
+# Template lookups are cached; a shared Redis cache keeps every worker in
+# sync on template changes. Without REDIS_URL each process has its own
+# local-memory cache, so other workers can serve a changed template for up
+# to TEMPLATE_CACHE_TIMEOUT seconds.
+if config('REDIS_URL', default=''):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -107,6 +130,9 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Raise on lazy related-field queries while serializing API lists (N+1 guard)
+STRICT_SERIALIZATION = config('STRICT_SERIALIZATION', default=DEBUG, cast=bool)
+
 # CORS configuration
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
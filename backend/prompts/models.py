@@ -3,9 +3,16 @@ Database models for Echo prompt enhancement application.
 """
 
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.validators import MinLengthValidator
 
+TEMPLATE_CACHE_TIMEOUT = 300  # Seconds a cached template lookup stays valid
+TEMPLATE_MISS_CACHE_TIMEOUT = 5  # Seconds an unknown template id stays cached
+_TEMPLATE_MISSING = '__missing__'  # Cached marker for unknown template ids
+
 
 class Template(models.Model):
     """
@@ -38,6 +45,40 @@ class Template(models.Model):
     def __str__(self):
         return f"{self.name} ({self.category})"
 
+    @staticmethod
+    def cache_key(template_id):
+        """Cache key for a single template lookup."""
+        return f'tmpl:{template_id}'
+
+    @classmethod
+    def get_cached(cls, template_id):
+        """
+        Return template by id from the cache, falling back to the database.
+        Missing ids return None and are cached only briefly
+        (TEMPLATE_MISS_CACHE_TIMEOUT), so arbitrary ids can't crowd out real
+        templates.
+
+        Changes are invalidated through the cache, so they reach every worker
+        only with a shared backend (REDIS_URL). With the local-memory fallback
+        other workers may serve a stale template for up to
+        TEMPLATE_CACHE_TIMEOUT seconds.
+        """
+        # Ids that can't exist are rejected without touching the cache
+        if len(template_id) > cls._meta.get_field('id').max_length:
+            return None
+
+        key = cls.cache_key(template_id)
+        template = cache.get(key)
+        if template is None:
+            template = cls.objects.filter(id=template_id).first()
+            if template is None:
+                cache.set(key, _TEMPLATE_MISSING, TEMPLATE_MISS_CACHE_TIMEOUT)
+            else:
+                cache.set(key, template, TEMPLATE_CACHE_TIMEOUT)
+
+        if template == _TEMPLATE_MISSING:
+            return None
+        return template
 
 class Prompt(models.Model):
     """
@@ -118,7 +159,19 @@ class SavedPrompt(models.Model):
         indexes = [
             models.Index(fields=['user', '-last_accessed']),
             models.Index(fields=['user', 'is_favorite']),
+            # Partial index serving the ordered favorites listing
+            models.Index(
+                fields=['user', '-last_accessed'],
+                name='saved_fav_idx',
+                condition=models.Q(is_favorite=True),
+            ),
         ]
 
     def __str__(self):
         return f"{self.user.username} - {self.custom_title or 'Untitled'}"
+
+
+@receiver([post_save, post_delete], sender=Template)
+def invalidate_template_cache(sender, instance, **kwargs):
+    """Drop cached template lookup whenever a template changes."""
+    cache.delete(Template.cache_key(instance.pk))
@@ -2,17 +2,61 @@
 Django REST Framework serializers for API request/response handling.
 """
 
+from django.conf import settings
+from django.db import connection
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
 from .models import Template, Prompt, EnhancedPrompt, SavedPrompt
 
 
+class LazyQueryError(RuntimeError):
+    """
+    Raised when serializing a list runs a query per row (N+1).
+    """
+
+
+class StrictListSerializer(serializers.ListSerializer):
+    """
+    List serializer that forbids database queries while rendering rows.
+
+    Enabled by the STRICT_SERIALIZATION setting (defaults to DEBUG). Any
+    related field read during serialization must come from select_related
+    or prefetch_related on the view's queryset, otherwise LazyQueryError
+    is raised instead of silently issuing one query per row.
+    """
+
+    def to_representation(self, data):
+        if not getattr(settings, 'STRICT_SERIALIZATION', False):
+            return super().to_representation(data)
+
+        # Evaluate the list query itself before forbidding further queries
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+
+        def forbid_query(execute, sql, params, many, context):
+            raise LazyQueryError(
+                f"Lazy query while serializing {self.child.__class__.__name__}: {sql}"
+            )
+
+        with connection.execute_wrapper(forbid_query):
+            return super().to_representation(items)
+
+
 class TemplateSerializer(serializers.ModelSerializer):
     """
     Serializer for Template model - converts to/from JSON.
     """
     class Meta:
         model = Template
-        fields = ['id', 'name', 'category', 'description', 'system_prompt_prefix']
+        fields = ['id', 'name', 'category', 'description']
+        list_serializer_class = StrictListSerializer
+
+
+class TemplateDetailSerializer(TemplateSerializer):
+    """
+    Serializer for single Template - includes the system prompt prefix.
+    """
+    class Meta(TemplateSerializer.Meta):
+        fields = TemplateSerializer.Meta.fields + ['system_prompt_prefix']
         read_only_fields = ['system_prompt_prefix']
 
 
@@ -36,6 +80,16 @@ class EnhancedPromptSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class EnhancedPromptListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight EnhancedPrompt serializer for list views - metadata only.
+    """
+    class Meta:
+        model = EnhancedPrompt
+        fields = ['id', 'model_used', 'tokens_used']
+        read_only_fields = fields
+
+
 class PromptEnhancementRequestSerializer(serializers.Serializer):
     """
     Serializer for incoming enhancement requests from frontend.
@@ -69,6 +123,18 @@ class PromptEnhancementRequestSerializer(serializers.Serializer):
     )
 
 
+class PromptEnhancementBulkRequestSerializer(serializers.Serializer):
+    """
+    Serializer for bulk enhancement requests - a list of enhancement requests.
+    """
+    prompts = PromptEnhancementRequestSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=20,
+        help_text="Prompts to enhance, same shape as a single enhance request"
+    )
+
+
 class PromptEnhancementResponseSerializer(serializers.Serializer):
     """
     Serializer for enhancement response to send back to frontend.
@@ -78,13 +144,16 @@ class PromptEnhancementResponseSerializer(serializers.Serializer):
     enhanced = EnhancedPromptSerializer()
     created_at = serializers.DateTimeField()
 
+    class Meta:
+        list_serializer_class = StrictListSerializer
+
 
 class SavedPromptSerializer(serializers.ModelSerializer):
     """
     Serializer for SavedPrompt model with nested enhanced prompt data.
     """
     original_text = serializers.CharField(source='prompt.original_text', read_only=True)
-    enhanced = EnhancedPromptSerializer(source='enhanced', read_only=True)
+    enhanced = EnhancedPromptSerializer(read_only=True)
 
     class Meta:
         model = SavedPrompt
@@ -98,6 +167,14 @@ class SavedPromptSerializer(serializers.ModelSerializer):
             'created_at',
             'last_accessed',
         ]
+        list_serializer_class = StrictListSerializer
+
+
+class SavedPromptListSerializer(SavedPromptSerializer):
+    """
+    Serializer for SavedPrompt list views - omits heavy PTCF fields.
+    """
+    enhanced = EnhancedPromptListSerializer(read_only=True)
 
 
 class SavedPromptCreateSerializer(serializers.ModelSerializer):
@@ -6,23 +6,40 @@ Handles prompt enhancement, templates, and saved prompts.
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
 from rest_framework.parsers import JSONParser
+from django.db import transaction
 from django.utils.timezone import now
+from concurrent.futures import ThreadPoolExecutor
 import time
 import logging
 
 from .models import Template, Prompt, EnhancedPrompt, SavedPrompt
 from .serializers import (
     TemplateSerializer,
+    TemplateDetailSerializer,
     PromptEnhancementRequestSerializer,
+    PromptEnhancementBulkRequestSerializer,
     PromptEnhancementResponseSerializer,
     SavedPromptSerializer,
+    SavedPromptListSerializer,
     SavedPromptCreateSerializer,
 )
-from utils.gemini_client import GeminiClient
+from utils.gemini_client import get_gemini_client
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SYSTEM_PROMPT = 'You are a prompt engineer specializing in PTCF framework optimization.'
+BULK_ENHANCE_CONCURRENCY = 8  # Max Gemini calls in flight per bulk request
+PTCF_FIELDS = (
+    'persona',
+    'task',
+    'context',
+    'format',
+    'consolidated_prompt',
+    'improvement_summary',
+)
+
 
 class TemplateViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -36,20 +53,59 @@ class TemplateViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['category']
     search_fields = ['name', 'category']
 
+    def get_queryset(self):
+        """Skip loading system_prompt_prefix when listing templates."""
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.only('id', 'name', 'category', 'description')
+        return queryset
+
+    def get_serializer_class(self):
+        """Expose system_prompt_prefix only on the detail endpoint."""
+        if self.action == 'retrieve':
+            return TemplateDetailSerializer
+        return TemplateSerializer
+
+
+class PromptHistoryPagination(CursorPagination):
+    """
+    Keyset pagination over (user, -created_at) index.
+    Avoids the COUNT(*) and OFFSET scans of page number pagination.
+    """
+    ordering = '-created_at'
+
 
 class PromptEnhancementViewSet(viewsets.ModelViewSet):
     """
     API endpoint for prompt enhancement.
     POST /api/prompts/enhance/ - Enhance a weak prompt
+    POST /api/prompts/bulk_enhance/ - Enhance a list of weak prompts
     GET /api/prompts/{id}/ - Get enhancement result
     """
     serializer_class = PromptEnhancementResponseSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [JSONParser]
+    pagination_class = PromptHistoryPagination
+    # CursorPagination takes its ordering from OrderingFilter when present,
+    # and ?ordering= must not swap the cursor key for another column
+    filter_backends = []
 
     def get_queryset(self):
         """Return only prompts owned by current user."""
-        return Prompt.objects.filter(user=self.request.user)
+        return Prompt.objects.filter(user=self.request.user).select_related(
+            'enhanced', 'template'
+        )
+
+    def _get_system_prompt(self, template, custom_system_prompt):
+        """
+        Pick system prompt: custom override first, then template prefix, then default.
+        The template prefix is only read when no custom prompt is given.
+        """
+        if custom_system_prompt:
+            return custom_system_prompt
+        if template is not None:
+            return template.system_prompt_prefix
+        return DEFAULT_SYSTEM_PROMPT
 
     @action(detail=False, methods=['post'])
     def enhance(self, request):
@@ -78,43 +134,28 @@ class PromptEnhancementViewSet(viewsets.ModelViewSet):
         max_tokens = data.get('max_tokens', 2048)
         custom_system_prompt = data.get('custom_system_prompt', '')
 
-        # Get template if provided
+        # Get template if provided (still attached when a custom prompt overrides it)
         template = None
-        system_prompt = 'You are a prompt engineer specializing in PTCF framework optimization.'
-        
         if template_id:
-            try:
-                template = Template.objects.get(id=template_id)
-                system_prompt = template.system_prompt_prefix
-            except Template.DoesNotExist:
+            template = Template.get_cached(template_id)
+            if template is None:
                 return Response(
                     {'error': 'Template not found'},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-        # Override system prompt if custom one provided
-        if custom_system_prompt:
-            system_prompt = custom_system_prompt
-
-        # Create Prompt record
-        prompt = Prompt.objects.create(
-            user=request.user,
-            original_text=prompt_text,
-            template=template,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        system_prompt = self._get_system_prompt(template, custom_system_prompt)
 
         # Call Gemini API
-        start_time = time.time()
-        client = GeminiClient()
+        start_ns = time.perf_counter_ns()
+        client = get_gemini_client()
         result = client.enhance_prompt(
             weak_prompt=prompt_text,
             system_prompt=system_prompt,
             temperature=temperature,
             max_tokens=max_tokens,
         )
-        processing_time_ms = int((time.time() - start_time) * 1000)
+        processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
         # Handle API errors
         if not result['success']:
@@ -123,38 +164,141 @@ class PromptEnhancementViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Parse and store enhanced prompt
+        # Pull PTCF fields out of the response
         try:
-            enhanced_data = result['data']
-            enhanced = EnhancedPrompt.objects.create(
+            ptcf = {field: result['data'][field] for field in PTCF_FIELDS}
+        except KeyError as e:
+            logger.error(f"Missing field in Gemini response: {e}")
+            return Response(
+                {'error': f'Invalid response structure: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        # Store prompt and enhanced prompt in a single transaction
+        with transaction.atomic():
+            prompt = Prompt.objects.create(
+                user=request.user,
+                original_text=prompt_text,
+                template=template,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            EnhancedPrompt.objects.create(
                 prompt=prompt,
-                persona=enhanced_data['persona'],
-                task=enhanced_data['task'],
-                context=enhanced_data['context'],
-                format=enhanced_data['format'],
-                consolidated_prompt=enhanced_data['consolidated_prompt'],
-                improvement_summary=enhanced_data['improvement_summary'],
                 model_used=result['model'],
                 tokens_used=result.get('tokens_used'),
                 processing_time_ms=processing_time_ms,
+                **ptcf,
             )
 
-            # Return response with enhanced prompt
-            response_serializer = PromptEnhancementResponseSerializer(prompt)
-            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        # Return response with enhanced prompt
+        response_serializer = PromptEnhancementResponseSerializer(prompt)
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
-        except KeyError as e:
-            logger.error(f"Missing field in Gemini response: {e}")
-            return Response(
-                {'error': f'Invalid response structure: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+    @action(detail=False, methods=['post'])
+    def bulk_enhance(self, request):
+        """
+        POST endpoint to enhance several weak prompts in one request.
+
+        Request body:
+        {
+            "prompts": [{enhance request body}, ...]  (max 20)
+        }
+
+        Gemini calls run concurrently, up to BULK_ENHANCE_CONCURRENCY at once.
+        Returns one entry per input prompt, in order:
+        {"id": 42} on success or {"error": "...", "details": "..."} on failure.
+        Responds 201 if at least one prompt was stored, 400 if none were.
+        """
+        # Validate request
+        serializer = PromptEnhancementBulkRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Resolve templates up front so a bad id fails before any API call
+        jobs = []
+        for item in serializer.validated_data['prompts']:
+            template = None
+            template_id = item.get('template_id')
+
+            if template_id:
+                template = Template.get_cached(template_id)
+                if template is None:
+                    return Response(
+                        {'error': f"Template '{template_id}' not found"},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+
+            system_prompt = self._get_system_prompt(template, item.get('custom_system_prompt'))
+            jobs.append((item, template, system_prompt))
+
+        # Call Gemini API concurrently
+        client = get_gemini_client()
+
+        def run(job):
+            item, _, system_prompt = job
+            start_ns = time.perf_counter_ns()
+            result = client.enhance_prompt(
+                weak_prompt=item['prompt_text'],
+                system_prompt=system_prompt,
+                temperature=item.get('temperature', 0.3),
+                max_tokens=item.get('max_tokens', 2048),
             )
+            result['processing_time_ms'] = (time.perf_counter_ns() - start_ns) // 1_000_000
+            return result
+
+        with ThreadPoolExecutor(max_workers=BULK_ENHANCE_CONCURRENCY) as pool:
+            results = list(pool.map(run, jobs))
+
+        # Build rows for successful results, errors for the rest
+        entries = []
+        prompts = []
+        enhanced_prompts = []
+        for (item, template, _), result in zip(jobs, results):
+            if not result['success']:
+                entries.append({'error': result['error'], 'details': result.get('details')})
+                continue
+
+            try:
+                ptcf = {field: result['data'][field] for field in PTCF_FIELDS}
+            except KeyError as e:
+                logger.error(f"Missing field in Gemini response: {e}")
+                entries.append({'error': f'Invalid response structure: {str(e)}'})
+                continue
+
+            prompt = Prompt(
+                user=request.user,
+                original_text=item['prompt_text'],
+                template=template,
+                temperature=item.get('temperature', 0.3),
+                max_tokens=item.get('max_tokens', 2048),
+            )
+            prompts.append(prompt)
+            enhanced_prompts.append(EnhancedPrompt(
+                prompt=prompt,
+                model_used=result['model'],
+                tokens_used=result.get('tokens_used'),
+                processing_time_ms=result['processing_time_ms'],
+                **ptcf,
+            ))
+            entries.append(prompt)
+
+        # Nothing succeeded, report the failures like a failed single enhance
+        if not prompts:
+            return Response(entries, status=status.HTTP_400_BAD_REQUEST)
+
+        # Store all successful results in a single transaction
+        with transaction.atomic():
+            Prompt.objects.bulk_create(prompts)
+            EnhancedPrompt.objects.bulk_create(enhanced_prompts)
+
+        data = [{'id': entry.pk} if isinstance(entry, Prompt) else entry for entry in entries]
+        return Response(data, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['get'])
     def history(self, request):
         """
         GET endpoint to retrieve user's prompt history.
-        Supports filtering by date and pagination.
+        Supports filtering by date and cursor pagination.
         """
         queryset = self.get_queryset()
         
@@ -187,9 +331,30 @@ class SavedPromptViewSet(viewsets.ModelViewSet):
     serializer_class = SavedPromptSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    list_actions = ('list', 'favorites')
+
     def get_queryset(self):
         """Return only saved prompts owned by current user."""
-        return SavedPrompt.objects.filter(user=self.request.user)
+        queryset = SavedPrompt.objects.filter(user=self.request.user).select_related(
+            'prompt', 'enhanced'
+        )
+        if self.action in self.list_actions:
+            # List views only render enhanced metadata, skip the PTCF columns
+            queryset = queryset.defer(
+                'enhanced__persona',
+                'enhanced__task',
+                'enhanced__context',
+                'enhanced__format',
+                'enhanced__consolidated_prompt',
+                'enhanced__improvement_summary',
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        """Use the lightweight serializer for list views."""
+        if self.action in self.list_actions:
+            return SavedPromptListSerializer
+        return SavedPromptSerializer
 
     def create(self, request, *args, **kwargs):
         """Create a new saved prompt."""
@@ -217,7 +382,9 @@ class SavedPromptViewSet(viewsets.ModelViewSet):
         """Toggle favorite status of saved prompt."""
         saved_prompt = self.get_object()
         saved_prompt.is_favorite = not saved_prompt.is_favorite
-        saved_prompt.save()
+        # auto_now only runs for fields named in update_fields, so last_accessed
+        # must be listed to keep being refreshed
+        saved_prompt.save(update_fields=['is_favorite', 'last_accessed'])
         
         serializer = self.get_serializer(saved_prompt)
         return Response(serializer.data)
@@ -5,23 +5,82 @@ Handles API calls and response parsing with error handling.
 
 import json
 import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from django.conf import settings
 import google.generativeai as genai
+import orjson
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = 'gemini-2.5-flash'
+
+
+def _string_schema() -> Dict[str, Any]:
+    """Schema node for a plain string value."""
+    return {'type_': 'STRING'}
+
+
+def _string_list_schema() -> Dict[str, Any]:
+    """Schema node for a list of strings."""
+    return {'type_': 'ARRAY', 'items': _string_schema()}
+
+
+def _object_schema(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Schema node for an object whose properties are all required."""
+    return {'type_': 'OBJECT', 'properties': properties, 'required': list(properties)}
+
+
+# Response schema for Gemini structured output (PTCF structure). Keys use the
+# proto-plus field name type_, which every proto-plus release accepts
+PTCF_SCHEMA = _object_schema({
+    'persona': _object_schema({
+        'role': _string_schema(),
+        'expertise': _string_schema(),
+        'perspective': _string_schema(),
+    }),
+    'task': _object_schema({
+        'objective': _string_schema(),
+        'deliverable': _string_schema(),
+        'constraints': _string_list_schema(),
+    }),
+    'context': _object_schema({
+        'technical_background': _string_schema(),
+        'key_considerations': _string_list_schema(),
+        'audience': _string_schema(),
+    }),
+    'format': _object_schema({
+        'output_style': _string_schema(),
+        'structure': _string_list_schema(),
+        'tone': _string_schema(),
+    }),
+    'consolidated_prompt': _string_schema(),
+    'improvement_summary': _string_schema(),
+})
+
+# Converted to a Schema proto once at import; the SDK would otherwise
+# rebuild it from the dict on every generate_content call
+PTCF_RESPONSE_SCHEMA = genai.protos.Schema(PTCF_SCHEMA)
+
+# Prompt sent to Gemini; the JSON shape is enforced by PTCF_SCHEMA rather
+# than described here
+_PROMPT_TEMPLATE = """{system_prompt}
+
+User prompt to transform: "{weak_prompt}"
+"""
+
 
 class GeminiClient:
     """
     Client for interacting with Gemini 2.5 Flash model.
     """
 
-    def __init__(self):
+    def __init__(self, model_name: str = DEFAULT_MODEL):
         """Initialize Gemini with API key from Django settings."""
         self.api_key = settings.GEMINI_API_KEY
+        self.model_name = model_name
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.model = genai.GenerativeModel(model_name)
 
     def enhance_prompt(
         self,
@@ -43,25 +102,14 @@ class GeminiClient:
             Dictionary with PTCF structure and metadata
         """
         try:
-            # Build complete prompt with system context
-            full_prompt = f"""{system_prompt}
-
-CRITICAL: Output ONLY valid JSON. No explanations, no markdown, no extra text.
-
-User prompt to transform: "{weak_prompt}"
-
-Return ONLY this exact JSON format with no other text:
-{{
-  "original_prompt": "{weak_prompt}",
-  "persona": {{"role": "specific role", "expertise": "area of expertise", "perspective": "unique perspective"}},
-  "task": {{"objective": "clear objective", "deliverable": "expected output", "constraints": ["constraint1", "constraint2"]}},
-  "context": {{"technical_background": "relevant background", "key_considerations": ["consideration1"], "audience": "target audience"}},
-  "format": {{"output_style": "style description", "structure": ["element1", "element2"], "tone": "tone"}},
-  "consolidated_prompt": "the final enhanced prompt text here",
-  "improvement_summary": "brief explanation of improvements"
-}}"""
-
-            # Call Gemini API
+            # Build complete prompt with system context; quotes in the user
+            # prompt are escaped so it stays inside its quoted block
+            full_prompt = _PROMPT_TEMPLATE.format_map({
+                'system_prompt': system_prompt,
+                'weak_prompt': weak_prompt.replace('"', '\\"'),
+            })
+
+            # Call Gemini API with native structured output
             response = self.model.generate_content(
                 full_prompt,
                 generation_config=genai.types.GenerationConfig(
@@ -69,6 +117,8 @@ Return ONLY this exact JSON format with no other text:
                     max_output_tokens=max_tokens,
                     top_p=0.9,
                     top_k=40,
+                    response_mime_type='application/json',
+                    response_schema=PTCF_RESPONSE_SCHEMA,
                 ),
             )
 
@@ -84,10 +134,11 @@ Return ONLY this exact JSON format with no other text:
             return {
                 'success': True,
                 'data': parsed_response,
-                'tokens_used': response.usage_metadata.output_tokens,
-                'model': 'gemini-2.5-flash',
+                'tokens_used': response.usage_metadata.candidates_token_count,
+                'model': self.model_name,
             }
 
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
         except json.JSONDecodeError as e:
             logger.error(f"JSON parsing error: {e}")
             return {
@@ -105,8 +156,9 @@ Return ONLY this exact JSON format with no other text:
 
     def _extract_json(self, text: str) -> Dict[str, Any]:
         """
-        Extract JSON from response text using boundary detection.
-        More reliable than regex for nested structures.
+        Parse JSON from response text.
+        Structured output returns a bare JSON object, which is parsed directly;
+        anything else falls back to boundary detection.
 
         Args:
             text: Response text that may contain JSON and extra text
@@ -114,7 +166,11 @@ Return ONLY this exact JSON format with no other text:
         Returns:
             Parsed JSON dictionary
         """
-        # Find first { and last }
+        text = text.strip()
+        if text.startswith('{') and text.endswith('}'):
+            return orjson.loads(text)
+
+        # Fallback: find first { and last }
         start_idx = text.find('{')
         end_idx = text.rfind('}')
 
@@ -122,5 +178,15 @@ Return ONLY this exact JSON format with no other text:
             raise json.JSONDecodeError("No JSON structure found", text, 0)
 
         # Extract JSON substring and parse
-        json_str = text[start_idx : end_idx + 1]
-        return json.loads(json_str)
+        return orjson.loads(text[start_idx : end_idx + 1])
+
+
+@lru_cache(maxsize=None)
+def get_gemini_client(model_name: str = DEFAULT_MODEL) -> GeminiClient:
+    """
+    Return a shared GeminiClient for the given model.
+
+    Configuring the SDK and building the GenerativeModel is done once per
+    process, so repeated requests reuse the same underlying connections.
+    """
+    return GeminiClient(model_name)
@@ -52,13 +52,23 @@ export const enhancePrompt = async (
   return response.data;
 };
 
+/**
+ * Send several weak prompts for enhancement in one request
+ * Returns one entry per prompt: the new prompt id, or an error
+ */
+export const bulkEnhancePrompts = async (
+  prompts: EnhancePromptRequest[]
+): Promise<Array<{ id: number } | { error: string; details?: string }>> => {
+  const response = await apiClient.post('/prompts/bulk_enhance/', { prompts });
+  return response.data;
+};
+
 /**
  * Fetch user's prompt enhancement history
+ * Pass a previous response's `next` or `previous` URL to fetch that page
  */
-export const getPromptHistory = async (page = 1) => {
-  const response = await apiClient.get('/prompts/history/', {
-    params: { page },
-  });
+export const getPromptHistory = async (pageUrl?: string | null) => {
+  const response = await apiClient.get(pageUrl || '/prompts/history/');
   return response.data;
 };
 
@@ -5,7 +5,7 @@ export interface Template {
   name: string;
   category: string;
   description: string;
-  system_prompt_prefix: string;
+  system_prompt_prefix?: string;  // Only returned by the detail endpoint
 }
 
 /**